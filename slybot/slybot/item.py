@@ -52,6 +52,7 @@ class SlybotFieldDescriptor(FieldDescriptor):
     """Extends the scrapely field descriptor to use slybot fieldtypes and
     to be created from a slybot item schema
     """
+    __slots__ = ('adapt', '_processor')
 
     def __init__(self, name, description, field_type_processor, required=False):
         """Create a new SlybotFieldDescriptor with the given name and description.
@@ -92,7 +93,6 @@ def create_item_version(item):
     """Item version based on hashlib.sha1 algorithm"""
     if not item.version_fields:
         return
-    _hash = hashlib.sha1()
-    for attrname in item.version_fields:
-        _hash.update(repr(item.get(attrname)))
-    return _hash.digest()
+    return hashlib.sha1(''.join(
+        repr(item.get(attrname)) for attrname in item.version_fields
+    )).digest()
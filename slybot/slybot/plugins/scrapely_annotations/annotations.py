@@ -68,8 +68,8 @@ class Annotations(object):
                 apply_extractors(item_descriptor, template_extractors,
                                  extractors)
                 descriptors[schema_name] = item_descriptor
-            descriptor = descriptors.values() or [{}]
-            descriptors['#default'] = descriptors.get(default, descriptor[0])
+            descriptor = next(iter(descriptors.values()), {})
+            descriptors['#default'] = descriptors.get(default, descriptor)
             self.schema_descriptors[template.page_id] = descriptors['#default']
             page_descriptor_pairs.append((template, descriptors, v))
             add_extractors_to_descriptors(descriptors, extractors)
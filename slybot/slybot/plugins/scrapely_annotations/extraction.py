@@ -46,15 +46,47 @@ def _compose(f, g):
     return _exec
 
 
+def _compose_modifiers(modifiers):
+    """given functions of (value, htmlpage), return a function that applies
+    all of them in order
+    """
+    def _exec(value, htmlpage):
+        for modifier in modifiers:
+            value = modifier(value, htmlpage)
+        return value
+    return _exec
+
+
 MAX_SEARCH_DISTANCE_MULTIPLIER = 3
 MIN_TOKEN_LENGTH_BEFORE_TRUNCATE = 3
 MIN_JUMP_DISTANCE = 0.7
 MAX_RELATIVE_SEPARATOR_MULTIPLIER = 0.7
 _DEFAULT_EXTRACTOR = FieldTypeManager().type_processor_class('raw html')()
+_REGION_TYPES = (HtmlPageParsedRegion, HtmlPageRegion)
+_SEQUENCE_TYPES = (list, tuple)
+_MISSING = object()
 Region = namedtuple('Region', ['score', 'start_index', 'end_index'])
 container_id = lambda x: x.annotation.metadata.get('container_id')
 
 
+def _to_iter(value):
+    """arg_to_iter with a shortcut for the lists and tuples that extraction
+    passes around
+    """
+    if value.__class__ in _SEQUENCE_TYPES:
+        return value
+    return arg_to_iter(value)
+
+
+def _decode_id(annotation_id):
+    """utf-8 decode byte string annotation ids, leaving other ids as they
+    are
+    """
+    if isinstance(annotation_id, str):
+        return annotation_id.decode('utf-8')
+    return annotation_id
+
+
 def _int_cmp(a, op, b):
     op = getattr(operator, op)
     a = -float('inf') if a is None else a
@@ -121,12 +153,13 @@ class SlybotTemplatePageParser(TemplatePageParser):
 
 
 class SlybotTemplatePage(TemplatePage):
-    __slots__ = ('descriptors', 'modifiers')
+    __slots__ = ('descriptors', 'modifiers', '_annotations_by_id')
 
     def __init__(self, htmlpage, token_dict, page_tokens, annotations,
                  template_id=None, ignored_regions=None, extra_required=None,
                  descriptors=None):
         self.descriptors = descriptors
+        self._annotations_by_id = None
         self.modifiers = {}
         for descriptor in descriptors.values():
             self.modifiers.update(getattr(descriptor, 'extractors', {}))
@@ -139,6 +172,16 @@ class SlybotTemplatePage(TemplatePage):
             descriptor_name = '#default'
         return self.descriptors.get(descriptor_name, {})
 
+    def find_annotation(self, annotation_id):
+        """Find the first annotation with the given id"""
+        if self._annotations_by_id is None:
+            annotations_by_id = {}
+            for annotation in self.annotations:
+                aid = _decode_id(annotation.metadata.get('id', ''))
+                annotations_by_id.setdefault(aid, annotation)
+            self._annotations_by_id = annotations_by_id
+        return self._annotations_by_id.get(_decode_id(annotation_id))
+
 
 class BaseExtractor(BasicTypeExtractor):
     def __init__(self, annotation, attribute_descriptors=None):
@@ -278,12 +321,14 @@ class SlybotRecordExtractor(RecordExtractor):
             content = annotation.surrounds_attribute or []
             attributes = annotation.tag_attributes
             attrs = chain(content, *(a for _, a in attributes))
-            extracted_ids = {a['id'] for annos, _ in extracted_data
-                             for a in annos
-                             if isinstance(a, dict) and 'id' in a}
-            if (any(isinstance(k, dict) and k.get('required') and
-                    k.get('id') not in extracted_ids for k in attrs)):
-                raise MissingRequiredError()
+            required_ids = [k.get('id') for k in attrs
+                            if isinstance(k, dict) and k.get('required')]
+            if required_ids:
+                extracted_ids = {a['id'] for annos, _ in extracted_data
+                                 for a in annos
+                                 if isinstance(a, dict) and 'id' in a}
+                if any(i not in extracted_ids for i in required_ids):
+                    raise MissingRequiredError()
         return pindex, sindex, extracted_data
 
 
@@ -301,7 +346,7 @@ class BaseContainerExtractor(object):
         schema_name = None
         if hasattr(self, 'annotation'):
             schema_name = self.annotation.metadata.get('schema_id')
-        self.schema = template.descriptor(schema_name).copy()
+        self._set_schema(template.descriptor(schema_name).copy())
         self.modifiers = template.modifiers
         extra_requires = getattr(self, 'extra_requires', [])
         self.extra_requires = extra_requires
@@ -309,6 +354,56 @@ class BaseContainerExtractor(object):
             requires = list(extra_requires) + self.schema._required_attributes
             self.schema._required_attributes = requires
 
+    def _set_schema(self, schema):
+        self.schema = schema
+        self._attribute_map = getattr(schema, 'attribute_map', {})
+        self._schema_type = getattr(schema, 'description', None)
+        self._schema_validates = getattr(schema, '_item_validates', None)
+        self._text_region_extractors = {}
+        self._modifier_chains = {}
+
+    def _field_descriptor(self, field):
+        """
+        Find the descriptor for a field, creating a default one for fields
+        that are missing from the schema.
+        """
+        descriptor = self._attribute_map.get(field)
+        if descriptor is None:
+            descriptor = SlybotFieldDescriptor(field, field,
+                                               _DEFAULT_EXTRACTOR)
+        return descriptor
+
+    def _text_region_descriptor(self, field, pre_text, post_text):
+        """
+        Create the descriptor for a field annotated with surrounding text,
+        building its extractor only once for each field, pre_text and
+        post_text.
+        """
+        descriptor = copy.copy(self._field_descriptor(field))
+        key = (field, pre_text, post_text)
+        extractor = self._text_region_extractors.get(key)
+        if extractor is None:
+            text_extractor = TextRegionDataExtractor(pre_text, post_text)
+            extractor = _compose(descriptor.extractor, text_extractor.extract)
+            self._text_region_extractors[key] = extractor
+        descriptor.extractor = extractor
+        return descriptor
+
+    def _modifier_chain(self, extractor_ids):
+        """
+        Compose the custom extractors applied to an annotation into a single
+        function, or None if none of them exist.
+        """
+        key = tuple(extractor_ids)
+        # None is cached for annotations whose extractors are all missing
+        composed = self._modifier_chains.get(key, _MISSING)
+        if composed is _MISSING:
+            modifiers = [self.modifiers[e] for e in key
+                         if self.modifiers.get(e)]
+            composed = _compose_modifiers(modifiers) if modifiers else None
+            self._modifier_chains[key] = composed
+        return composed
+
     @classmethod
     def apply(cls, template, extractors):
         # Group containers and get container info
@@ -410,11 +505,7 @@ class BaseContainerExtractor(object):
             if container_name not in containers:
                 continue  # Ignore missing containers
             container = container_annos[container_name]
-            annotation = None
-            for a in template.annotations:
-                if a.metadata.get('id') == container_name:
-                    annotation = a
-                    break
+            annotation = template.find_annotation(container_name)
             if container:
                 cls._add_new_container(
                     annotation, container_extractors, container_data,
@@ -441,11 +532,7 @@ class BaseContainerExtractor(object):
         """
         Look for an annotation with the given id in the given template
         """
-        annotation_id = annotation_id.decode('utf-8')
-        for annotation in template.annotations:
-            aid = annotation.metadata.get('id', '').decode('utf-8')
-            if aid == annotation_id:
-                return annotation
+        return template.find_annotation(annotation_id)
 
     def _validate_and_adapt_item(self, item, htmlpage):
         """
@@ -462,14 +549,8 @@ class BaseContainerExtractor(object):
                     continue
                 if k not in item:
                     return {}
-        new_item = defaultdict(list)
-        if isinstance(item, dict):
-            item = item.items()
-        elif item and not isinstance(item[0], (tuple, dict)):
-            item = [item]
-        item_fields = (list(i.items()) if hasattr(i, 'items') else (i,)
-                       for i in item)
-        for k, v in chain(*item_fields):
+        new_item = {}
+        for k, v in self._normalize_data(item):
             if hasattr(k, 'startswith'):
                 if k.startswith('_'):
                     new_item[k] = v
@@ -478,85 +559,91 @@ class BaseContainerExtractor(object):
                     continue
             try:
                 for k, v in self._process_fields(k, v, htmlpage):
-                    new_item[k].extend(v)
+                    new_item.setdefault(k, []).extend(v)
             except MissingRequiredError:
                 return {}
-        new_item_fields = {getattr(f, 'name', f): v
-                           for f, v in new_item.items() if v}
-        new_item = {getattr(f, 'description', f): v
-                    for f, v in new_item.items() if v}
-        _type = getattr(self.schema, 'description', None)
-        if (hasattr(self.schema, '_item_validates') and
-                not self.schema._item_validates(new_item_fields)):
-            return {}
-        merged_item = defaultdict(list)
+        validates = self._schema_validates
+        new_item_fields = {} if validates is not None else None
+        described_item = {}
         for f, v in new_item.items():
+            if v:
+                if new_item_fields is not None:
+                    new_item_fields[getattr(f, 'name', f)] = v
+                described_item[getattr(f, 'description', f)] = v
+        if validates is not None and not validates(new_item_fields):
+            return {}
+        merged_item = {}
+        for f, v in described_item.items():
             fieldname = getattr(f, 'description', f)
             try:
                 assert not fieldname.startswith('_')
-                merged_item[fieldname] += v
+                merged_item.setdefault(fieldname, []).extend(v)
             except (TypeError, AssertionError):
                 merged_item[fieldname] = v
-        if _type:
-            merged_item[u'_type'] = _type
-        return dict(merged_item)
+        if self._schema_type:
+            merged_item[u'_type'] = self._schema_type
+        return merged_item
+
+    @staticmethod
+    def _normalize_data(data):
+        """
+        Yield the (field, value) pairs of extracted data in order, flattening
+        any nested dicts.
+        """
+        if isinstance(data, dict):
+            data = data.items()
+        elif data and not isinstance(data[0], (tuple, dict)):
+            data = [data]
+        for entry in data:
+            if hasattr(entry, 'items'):
+                for pair in entry.items():
+                    yield pair
+            else:
+                yield entry
 
     def _process_fields(self, annotations, regions, htmlpage):
-        for annotation in arg_to_iter(annotations):
+        for annotation in _to_iter(annotations):
             if isinstance(annotation, dict):
                 field = annotation['field']
-                try:
-                    field_extraction = self.schema.attribute_map.get(field)
-                except AttributeError:
-                    field_extraction = None
-                if field_extraction is None:
-                    field_extraction = SlybotFieldDescriptor(
-                        field, field, _DEFAULT_EXTRACTOR)
                 if annotation.get('pre_text') or annotation.get('post_text'):
-                    text_extractor = TextRegionDataExtractor(
-                        annotation.get('pre_text', ''),
+                    field_extraction = self._text_region_descriptor(
+                        field, annotation.get('pre_text', ''),
                         annotation.get('post_text', ''))
-                    field_extraction = copy.deepcopy(field_extraction)
-                    field_extraction.extractor = _compose(
-                        field_extraction.extractor, text_extractor.extract)
+                else:
+                    field_extraction = self._field_descriptor(field)
                 extracted = self._process_values(
                     regions, htmlpage, field_extraction
                 )
-                for extractor in annotation.get('extractors', []):
-                    custom_extractor_func = self.modifiers.get(extractor)
-                    if custom_extractor_func and extracted:
-                        extracted = [custom_extractor_func(s, htmlpage)
-                                     for s in extracted]
+                extractor_ids = annotation.get('extractors')
+                if extractor_ids and extracted:
+                    modifier = self._modifier_chain(extractor_ids)
+                    if modifier is not None:
+                        extracted = [modifier(s, htmlpage) for s in extracted]
                 if annotation.get('required') and not extracted:
                     raise MissingRequiredError()
                 yield (field_extraction, extracted)
             else:
-                try:
-                    extraction_func = self.schema.attribute_map.get(annotation)
-                except AttributeError:
-                    extraction_func = None
-                if extraction_func is None:
-                    extraction_func = SlybotFieldDescriptor(
-                        annotation, annotation, _DEFAULT_EXTRACTOR)
+                extraction_func = self._field_descriptor(annotation)
                 values = self._process_values(regions, htmlpage,
                                               extraction_func)
                 yield (extraction_func, values)
 
     def _process_values(self, regions, htmlpage, extraction_func):
-        values = []
-        for value in arg_to_iter(regions):
-            if (isinstance(value, (HtmlPageParsedRegion, HtmlPageRegion)) and
-                    hasattr(extraction_func, 'extractor')):
-                value = extraction_func.extractor(value)
-            if value:
-                values.append(value)
+        extractor = getattr(extraction_func, 'extractor', None)
+        if extractor is None:
+            values = [v for v in _to_iter(regions) if v]
+        else:
+            values = []
+            for value in _to_iter(regions):
+                if isinstance(value, _REGION_TYPES):
+                    value = extractor(value)
+                if value:
+                    values.append(value)
         if hasattr(extraction_func, 'adapt'):
             if hasattr(htmlpage, 'htmlpage'):
                 htmlpage = htmlpage.htmlpage
             values = [extraction_func.adapt(x, htmlpage) for x in values
                       if x and not isinstance(x, dict)]
-        else:
-            values = list(filter(bool, values))
         return values
 
     def __str__(self):
@@ -658,17 +745,17 @@ class ContainerExtractor(BaseContainerExtractor, BasicTypeExtractor):
         return items
 
     def _merge_items(self, items):
-        result = defaultdict(list)
+        result = {}
         for item in items:
             if hasattr(item, 'items'):
                 item = item.items()
             for k, v in item:
                 if isinstance(v, list):
-                    result[k].extend(v)
+                    result.setdefault(k, []).extend(v)
                 else:
                     # Overwrites different item types
                     result[k] = v
-        return [dict(result)]
+        return [result]
 
 
 class RepeatedContainerExtractor(BaseContainerExtractor, RecordExtractor):
@@ -938,7 +1025,7 @@ class TemplatePageMultiItemExtractor(TemplatePageExtractor):
                 if item:
                     if isinstance(item, dict):
                         item[u'_template'] = self.template.id
-            items.extend(filter(bool, extracted))
+                    items.append(item)
         return items
 
 
@@ -66,7 +66,7 @@ descriptors = {'#default': create_slybot_item_descriptor(items['default'],
 
 class FakeContainer(BaseContainerExtractor):
     def __init__(self, schema, legacy=False):
-        self.schema = schema
+        self._set_schema(schema)
         self.extra_requires = []
         self.legacy = legacy
 
@@ -19,7 +19,7 @@ from slybot.plugins.scrapely_annotations.builder import (
 )
 from slybot.spider import IblSpider
 from scrapely.extraction.pageobjects import TokenDict
-from scrapely.htmlpage import HtmlPage
+from scrapely.htmlpage import HtmlPage, HtmlPageRegion
 from scrapely.extraction.regionextract import BasicTypeExtractor
 from scrapely.extraction.pageparsing import parse_extraction_page
 from scrapely.htmlpage import HtmlTagType
@@ -162,6 +162,10 @@ class ContainerExtractorTest(TestCase):
         self.assertEqual(a2d(bce._find_annotation(template, 'child')),
                          a2d(child_container.annotation))
         self.assertIsNone(bce._find_annotation(template, 'non_existant'))
+        self.assertEqual(a2d(bce._find_annotation(template, u'child')),
+                         a2d(child_container.annotation))
+        self.assertIsNone(bce._find_annotation(template, u'non_existant\xe9'))
+        self.assertIsNone(bce._find_annotation(template, None))
 
     def test_validate_and_adapt_item(self):
         bce = BaseContainerExtractor(basic_extractors, template)
@@ -188,6 +192,38 @@ class ContainerExtractorTest(TestCase):
         data['_sticky1'] = True
         self.assertEqual(bce._validate_and_adapt_item(data, template), result)
 
+    def test_repeated_annotations_for_missing_field(self):
+        bce = BaseContainerExtractor(basic_extractors, unvalidated_template)
+        data = [({'field': 'foo'}, [u'a']), ({'field': 'foo'}, [u'b'])]
+        item = bce._validate_and_adapt_item(data, unvalidated_template)
+        self.assertEqual(len(item['foo']), 1)
+        self.assertIn(item['foo'][0], [u'a', u'b'])
+        annotation = {'field': 'foo', 'pre_text': 'x: '}
+        data = [(dict(annotation), [HtmlPageRegion(html_page, u'x: a')]),
+                (dict(annotation), [HtmlPageRegion(html_page, u'x: b')])]
+        item = bce._validate_and_adapt_item(data, unvalidated_template)
+        self.assertEqual(len(item['foo']), 1)
+        self.assertIn(item['foo'][0], [u'a', u'b'])
+
+    def test_process_fields_with_surrounding_text(self):
+        bce = BaseContainerExtractor(basic_extractors, template)
+        annotation = {'field': 'color', 'pre_text': 'Color: ',
+                      'post_text': '.'}
+        region = HtmlPageRegion(html_page, u'Color: Red.')
+        [(descriptor, values)] = bce._process_fields(annotation, [region],
+                                                     html_page)
+        self.assertEqual(values, [u'Red'])
+        self.assertIsNot(descriptor, bce.schema.attribute_map['color'])
+        [(reused, values)] = bce._process_fields(dict(annotation), [region],
+                                                 html_page)
+        self.assertIsNot(reused, descriptor)
+        self.assertIs(reused.extractor, descriptor.extractor)
+        self.assertEqual(values, [u'Red'])
+        [(plain, values)] = bce._process_fields({'field': 'color'}, [region],
+                                                html_page)
+        self.assertIs(plain, bce.schema.attribute_map['color'])
+        self.assertEqual(values, [u'Color: Red.'])
+
     def test_find_tokens(self):
         htt = HtmlTagType
         s = RepeatedContainerExtractor._find_tokens(template.page_tokens[::-1],